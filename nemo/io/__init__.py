@@ -3,7 +3,7 @@ from nemo.io.capture import reinit
 from nemo.io.connector import Connector, ModelConnector
 from nemo.io.mixin import ConnectorMixin, IOMixin
 from nemo.io.pl import TrainerCheckpoint, is_distributed_ckpt
-from nemo.io.state import TransformCTX, apply_transforms, state_transform
+from nemo.io.state import TransformCTX, apply_transforms, lazy_load_state, state_transform
 
 __all__ = [
     "apply_transforms",
@@ -12,6 +12,7 @@ __all__ = [
     "IOMixin",
     "import_ckpt",
     "is_distributed_ckpt",
+    "lazy_load_state",
     "export_ckpt",
     "load",
     "load_ckpt",
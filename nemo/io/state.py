@@ -1,9 +1,13 @@
 import inspect
+import json
 import re
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar, Union, overload
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Iterator, List, Mapping, Optional, Tuple, TypeVar, Union, overload
 
 import numpy as np
+import torch
 from torch import nn
 
 SourceModuleT = TypeVar("SourceModuleT", bound=nn.Module)
@@ -17,6 +21,7 @@ class TransformCTX:
     source_state: dict
     target: nn.Module
     target_state: dict
+    executor: Optional[Executor] = None
 
 
 def apply_transforms(
@@ -24,6 +29,7 @@ def apply_transforms(
     target: TargetModuleT,
     mapping: Dict[str, str],
     transforms: Optional[List[Callable[[TransformCTX], TransformCTX]]] = None,
+    num_workers: int = 1,
 ) -> TargetModuleT:
     """
     Applies a series of transformations to adapt the state dictionary of a source module to 
@@ -41,6 +47,10 @@ def apply_transforms(
         transforms (Optional[List[Callable[[TransformCTX], TransformCTX]]]): A list of functions
             that modify the `TransformCTX` object. If None, no transformations beyond key renaming
             are applied. Defaults to None.
+        num_workers (int): Number of threads used to run the per-key calls of each transform.
+            The calls of a transform are independent and torch releases the GIL inside its ops, so
+            values > 1 overlap them. The intra-op threads of torch are split between the workers
+            so the pool does not oversubscribe the CPU. Defaults to 1 (sequential).
 
     Returns
     -------
@@ -84,21 +94,35 @@ def apply_transforms(
 
     # TODO: How can we improve this?
     _source = source
-    if hasattr(source, "module") and isinstance(source.module, MegatronModule):
+    if isinstance(getattr(source, "module", None), MegatronModule):
         _source = source.module
     _target = target
-    if hasattr(target, "module") and isinstance(target.module, MegatronModule):
+    if isinstance(getattr(target, "module", None), MegatronModule):
         _target = target.module
 
     target_state = _target.state_dict()
-    ctx = TransformCTX(source=_source, source_state=_source.state_dict(), target=_target, target_state=target_state,)
+    num_threads = torch.get_num_threads()
+    executor = None
+    if num_workers > 1:
+        executor = ThreadPoolExecutor(
+            max_workers=num_workers,
+            initializer=torch.set_num_threads,
+            initargs=(max(1, num_threads // num_workers),),
+        )
+    ctx = TransformCTX(
+        source=_source, source_state=_source.state_dict(), target=_target, target_state=target_state, executor=executor
+    )
 
-    for key, val in mapping.items():
-        ctx = StateDictTransform(key, val)(ctx)
+    try:
+        ctx = _apply_mapping(ctx, mapping)
 
-    if transforms:
-        for transform in transforms:
-            ctx = transform(ctx)
+        if transforms:
+            for transform in transforms:
+                ctx = transform(ctx)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+            torch.set_num_threads(num_threads)
 
     _params: Dict[str, nn.Parameter] = {}
     for name, param in _target.named_parameters():
@@ -112,14 +136,12 @@ def apply_transforms(
         else:
             print(f"Unexpected key: {name} not in checkpoint but in model.")
 
-    for key, val in _params.items():
-        _module, _key = _target, key
-        if "." in key:
-            for part in key.split(".")[:-1]:
-                _module = getattr(_module, part)
-            _key = key.split(".")[-1]
+    # Resolve owning modules from a table built once instead of walking the tree per key
+    _modules: Dict[str, nn.Module] = dict(_target.named_modules())
 
-        _module.register_parameter(_key, val)
+    for key, val in _params.items():
+        _prefix, _, _key = key.rpartition(".")
+        _modules[_prefix].register_parameter(_key, val)
 
     _buffers = {}
     for name, buffer in _target.named_buffers():
@@ -131,13 +153,8 @@ def apply_transforms(
             target_state.pop(name)
 
     for key, val in _buffers.items():
-        _module, _key = _target, key
-        if "." in key:
-            for part in key.split(".")[:-1]:
-                _module = getattr(_module, part)
-            _key = key.split(".")[-1]
-
-        _module.register_buffer(_key, val)
+        _prefix, _, _key = key.rpartition(".")
+        _modules[_prefix].register_buffer(_key, val)
 
     keys = [name for name in list(target_state.keys()) if not name.endswith("_extra_state")]
     if len(keys) != 0:
@@ -151,7 +168,7 @@ def apply_transforms(
     """finally:
         cls._set_model_restore_state(is_being_restored=False)"""
 
-    if hasattr(target, "module") and isinstance(target.module, MegatronModule):
+    if isinstance(getattr(target, "module", None), MegatronModule):
         target.module = _target
 
         return target
@@ -159,8 +176,121 @@ def apply_transforms(
     return _target
 
 
-def _default_transform(inp):
-    return inp.float()
+class _ModelState:
+    """
+    Stand-in for a source module that only exposes a state dictionary. Used when the source
+    weights are read straight from checkpoint files instead of an instantiated model.
+    """
+
+    def __init__(self, state_dict: Mapping[str, torch.Tensor], config=None):
+        self._state_dict = state_dict
+        self.config = config
+
+    def state_dict(self) -> Mapping[str, torch.Tensor]:
+        return self._state_dict
+
+
+class _LazyStateDict(Mapping[str, torch.Tensor]):
+    """
+    Read-only mapping over the tensors stored in a directory of checkpoint shards.
+
+    Safetensors shards (`model*.safetensors`) are preferred; legacy `pytorch_model*.bin` shards are
+    used as a fallback. When the matching `*.index.json` is present, only the files listed in its
+    `weight_map` are opened, so other weight files in the directory (e.g. a Mistral-native
+    `consolidated.safetensors`) are ignored.
+
+    Both formats are memory-mapped, so only the shard headers are parsed up-front and a tensor is
+    paged in from disk when its key is accessed. Peak host memory is bounded by the tensors in
+    flight rather than the full model. Tensors are cast to `dtype` as they are read so no second
+    pass over the weights is needed.
+    """
+
+    def __init__(self, path: Union[str, Path], dtype: Optional[torch.dtype] = None):
+        self._dtype = dtype
+        # key -> safetensors handle or memory-mapped state dict of the shard holding it
+        self._shards: Dict[str, Any] = {}
+
+        safetensors_shards = _shard_files(Path(path), "model.safetensors.index.json", "model*.safetensors")
+        if safetensors_shards:
+            from safetensors import safe_open
+
+            for shard, keys in safetensors_shards.items():
+                handle = safe_open(str(shard), framework="pt", device="cpu")
+                self._add_shard(shard, handle.keys() if keys is None else keys, handle)
+        else:
+            for shard, keys in _shard_files(Path(path), "pytorch_model.bin.index.json", "pytorch_model*.bin").items():
+                state = torch.load(str(shard), map_location="cpu", mmap=True, weights_only=True)
+                self._add_shard(shard, state.keys() if keys is None else keys, state)
+
+        if not self._shards:
+            raise FileNotFoundError(f"No model*.safetensors or pytorch_model*.bin shards found in {path}")
+
+    def _add_shard(self, shard: Path, keys, handle) -> None:
+        for key in keys:
+            if key in self._shards:
+                raise ValueError(f"Duplicate key {key} in checkpoint shard {shard}")
+            self._shards[key] = handle
+
+    def __getitem__(self, key: str) -> torch.Tensor:
+        shard = self._shards[key]
+        tensor = shard[key] if isinstance(shard, dict) else shard.get_tensor(key)
+
+        return tensor if self._dtype is None else tensor.to(self._dtype)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._shards)
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+
+def _shard_files(path: Path, index_name: str, pattern: str) -> Dict[Path, Optional[List[str]]]:
+    """
+    Returns the shard files of one checkpoint format in `path`, mapped to the keys the index lists
+    for them, or to None (all keys of the file) when there is no index.
+    """
+    index_file = path / index_name
+    if not index_file.exists():
+        return {shard: None for shard in sorted(path.glob(pattern))}
+
+    with open(index_file) as f:
+        weight_map: Dict[str, str] = json.load(f)["weight_map"]
+
+    shards: Dict[Path, Optional[List[str]]] = {}
+    for key, file_name in weight_map.items():
+        shards.setdefault(path / file_name, []).append(key)
+
+    return shards
+
+
+def lazy_load_state(path: Union[str, Path], config=None, dtype: Optional[torch.dtype] = None) -> _ModelState:
+    """
+    Wraps the checkpoint shards in `path` as a source module for `apply_transforms` without
+    instantiating the model or materializing its full state dictionary.
+
+    Args:
+        path (Union[str, Path]): Directory containing `model*.safetensors` shards, or legacy
+            `pytorch_model*.bin` shards if no safetensors are present. A `*.index.json` next to
+            the shards is followed when present.
+        config: Optional config exposed as `ctx.source.config` to transforms.
+        dtype (Optional[torch.dtype]): If set, tensors stored in another dtype are cast to it on
+            read, typically the `params_dtype` of the target. Defaults to None (keep stored dtype).
+
+    Returns
+    -------
+        _ModelState: An object whose `state_dict()` loads tensors on access.
+
+    Examples
+    --------
+        >>> source = lazy_load_state("/checkpoints/Mistral-7B-v0.1")
+        >>> target = apply_transforms(source, target, mapping=mapping)
+    """
+    return _ModelState(_LazyStateDict(path, dtype=dtype), config=config)
+
+
+def _default_transform(ctx: TransformCTX, inp):
+    # Megatron targets carry their parameter dtype on the config, anything else is loaded as fp32
+    return inp.to(getattr(getattr(ctx.target, "config", None), "params_dtype", torch.float32))
 
 
 class StateDictTransform(Generic[F]):
@@ -205,6 +335,9 @@ class StateDictTransform(Generic[F]):
         fn_params = dict(inspect.signature(self.transform).parameters)
         fn_params.pop("ctx", None)
 
+        # (target match, positional source keys, keyword source keys) for each call of the transform
+        jobs: List[Tuple[Any, List[str], Dict[str, str]]] = []
+
         if isinstance(source_key, (dict, tuple)):
             if isinstance(source_key, tuple):
                 source_key_dict = {param: source_key[i] for i, param in enumerate(fn_params)}
@@ -218,9 +351,9 @@ class StateDictTransform(Generic[F]):
                 for param in fn_params:
                     if param in source_matches_dict:
                         source_match = source_matches_dict[param][target_index[:-1]]
-                        kwargs[param] = source_dict[source_match[target_index]]
+                        kwargs[param] = source_match[target_index]
 
-                target_dict[target_match] = self.call_transform(ctx, **kwargs)
+                jobs.append((target_match, [], kwargs))
         else:
             source_keys = list(source_dict.keys())
             target_keys = list(target_dict.keys())
@@ -251,8 +384,7 @@ class StateDictTransform(Generic[F]):
                     source_match = source_matches[target_index]
 
                     if accepts_var_args:
-                        source_values = [source_dict[k] for k in source_match]
-                        target_dict[target_match] = self.call_transform(ctx, *source_values)
+                        jobs.append((target_match, list(source_match), {}))
                     else:
                         _source_match_list = [source_match] if isinstance(source_match, str) else list(source_match)
                         if len(fn_params) != len(_source_match_list):
@@ -260,8 +392,7 @@ class StateDictTransform(Generic[F]):
                                 f"Mismatch between source and target keys: {source_match} vs {target_match}"
                             )
 
-                        kwargs = {param: source_dict[k] for param, k in zip(fn_params, _source_match_list)}
-                        target_dict[target_match] = self.call_transform(ctx, **kwargs)
+                        jobs.append((target_match, [], dict(zip(fn_params, _source_match_list))))
             else:
                 if source_matches.ndim == 0:
                     source_matches_list = [source_matches.item()]
@@ -279,25 +410,36 @@ class StateDictTransform(Generic[F]):
 
                 for source_index, source_match in enumerate(source_matches_list):
                     target_match = target_matches[source_index]
-                    source_values = (
-                        [source_dict[source_match]]
-                        if np.isscalar(source_match)
-                        else [source_dict[k] for k in source_match]
-                    )
+                    _source_keys = [source_match] if np.isscalar(source_match) else list(source_match)
                     if accepts_var_args:
-                        outputs = self.call_transform(ctx, *source_values)
+                        jobs.append((target_match, _source_keys, {}))
                     else:
-                        kwargs = {param: val for param, val in zip(fn_params, source_values)}
-                        outputs = self.call_transform(ctx, **kwargs)
+                        jobs.append((target_match, [], dict(zip(fn_params, _source_keys))))
 
-                    if isinstance(target_match, str):
-                        target_dict[target_match] = outputs
-                    else:
-                        for i, t in enumerate(outputs):
-                            target_dict[target_match[i]] = t
+        self._run_jobs(ctx, jobs)
 
         return ctx
 
+    def _run_jobs(self, ctx: TransformCTX, jobs: List[Tuple[Any, List[str], Dict[str, str]]]) -> None:
+        source_dict, target_dict = ctx.source_state, ctx.target_state
+
+        # Source values are looked up inside the call so lazily loaded states are read on demand
+        def _run(job):
+            _, arg_keys, kwarg_keys = job
+            args = [source_dict[k] for k in arg_keys]
+            kwargs = {param: source_dict[k] for param, k in kwarg_keys.items()}
+            return self.call_transform(ctx, *args, **kwargs)
+
+        results = map(_run, jobs) if ctx.executor is None else ctx.executor.map(_run, jobs)
+
+        # Only this thread writes to the target state, so no locking is needed
+        for (target_match, _, _), outputs in zip(jobs, results):
+            if isinstance(target_match, np.ndarray):
+                for i, t in enumerate(outputs):
+                    target_dict[target_match[i]] = t
+            else:
+                target_dict[target_match] = outputs
+
     def call_transform(self, ctx: TransformCTX, *args, **kwargs):
         func_params = inspect.signature(self.transform).parameters
         expected_num_args = len([p for p in func_params if p not in ['self', 'ctx']])
@@ -316,35 +458,122 @@ class StateDictTransform(Generic[F]):
 
 
 def _match_keys(keys: List[str], pattern: str) -> np.ndarray:
-    regex_pattern = re.compile("^" + pattern.replace("*", "(.*)") + "$")
-    wildcard_matches = [[] for _ in range(pattern.count("*"))]
-
-    for key in keys:
-        match = regex_pattern.match(key)
-        if match:
-            for i, group in enumerate(match.groups()):
-                if group not in wildcard_matches[i]:
-                    wildcard_matches[i].append(group)
-
-    # Sort the wildcard matches to maintain consistent ordering
-    for i in range(len(wildcard_matches)):
-        wildcard_matches[i].sort(key=lambda x: int(x) if x.isdigit() else x)
-
-    # Determine the shape of the output array based on the unique matches for each wildcard
-    shape = [len(matches) for matches in wildcard_matches]
-
-    # Initialize an empty array with the determined shape
-    output_array = np.empty(shape, dtype=object)
-
-    # Populate the array with the keys, now that we have the correct shape and ordering
-    for key in keys:
-        match = regex_pattern.match(key)
-        if match:
-            # Convert match groups to indices based on their position in wildcard_matches
-            indices = [wildcard_matches[i].index(group) for i, group in enumerate(match.groups())]
-            output_array[tuple(indices)] = key  # Place the key in the array based on the indices
-
-    return output_array
+    return _match_keys_multi(keys, [pattern])[0]
+
+
+def _match_keys_multi(keys: List[str], patterns: List[str]) -> List[np.ndarray]:
+    """
+    Matches `keys` against several wildcard patterns at once. Patterns are split into groups whose
+    members can never match the same key, and each group is compiled into a single alternation
+    regex, so each key is classified with one match call per group instead of one per pattern.
+    A key that matches several patterns is reported for each of them.
+    """
+    if not patterns:
+        return []
+
+    # Greedily place each pattern in the first group where it cannot overlap any member
+    pattern_groups: List[List[int]] = []
+    for p, pattern in enumerate(patterns):
+        for pattern_group in pattern_groups:
+            if not any(_may_overlap(pattern, patterns[q]) for q in pattern_group):
+                pattern_group.append(p)
+                break
+        else:
+            pattern_groups.append([p])
+
+    counts = [pattern.count("*") for pattern in patterns]
+
+    # dicts keep first-seen order and give O(1) membership, unlike list `in`/`index`
+    wildcard_matches: List[List[Dict[str, int]]] = [[{} for _ in range(count)] for count in counts]
+
+    # One pass over the keys per group: remember the groups of each match instead of re-matching later
+    matched: List[List[Tuple[str, Tuple[str, ...]]]] = [[] for _ in patterns]
+    for pattern_group in pattern_groups:
+        regex_pattern = re.compile(
+            "|".join(f"(?P<p{p}>{patterns[p].replace('*', '(.*)')})" for p in pattern_group)
+        )
+        # Position of each pattern's first wildcard group within `match.groups()`
+        offsets = {p: regex_pattern.groupindex[f"p{p}"] for p in pattern_group}
+
+        for key in keys:
+            match = regex_pattern.fullmatch(key)
+            if match:
+                p = int(match.lastgroup[1:])
+                groups = match.groups()[offsets[p] : offsets[p] + counts[p]]
+                matched[p].append((key, groups))
+                for i, group in enumerate(groups):
+                    wildcard_matches[p][i].setdefault(group, 0)
+
+    outputs = []
+    for p in range(len(patterns)):
+        # Sort the wildcard matches to maintain consistent ordering
+        for i in range(counts[p]):
+            ordered = sorted(wildcard_matches[p][i], key=lambda x: int(x) if x.isdigit() else x)
+            wildcard_matches[p][i] = {group: index for index, group in enumerate(ordered)}
+
+        # Determine the shape of the output array based on the unique matches for each wildcard
+        shape = [len(matches) for matches in wildcard_matches[p]]
+
+        # Initialize an empty array with the determined shape
+        output_array = np.empty(shape, dtype=object)
+
+        # Place each key in the array based on the positions of its wildcard groups
+        for key, groups in matched[p]:
+            indices = tuple(wildcard_matches[p][i][group] for i, group in enumerate(groups))
+            output_array[indices] = key
+
+        outputs.append(output_array)
+
+    return outputs
+
+
+def _may_overlap(pattern: str, other: str) -> bool:
+    """
+    Conservatively checks whether two wildcard patterns can match a common key. Returns False only
+    when their fixed prefixes (before the first `*`) or suffixes (after the last `*`) disagree on a
+    character, or when both are free of wildcards and differ in length.
+    """
+    # Any other regex syntax breaks the one-character-per-position reasoning below
+    if set(pattern + other) & set("^$+?{}[]\\|()"):
+        return True
+    if "*" not in pattern and "*" not in other and len(pattern) != len(other):
+        return False
+
+    def _conflict(a: str, b: str) -> bool:
+        return any(x != y and x != "." and y != "." for x, y in zip(a, b))
+
+    if _conflict(pattern.split("*")[0], other.split("*")[0]):
+        return False
+
+    return not _conflict(pattern.split("*")[-1][::-1], other.split("*")[-1][::-1])
+
+
+def _apply_mapping(ctx: TransformCTX, mapping: Dict[str, str]) -> TransformCTX:
+    """
+    Copies source values to target keys for every entry of a plain key mapping. Source and target
+    keys are each classified against all mapping patterns in one pass per group of non-overlapping
+    patterns, instead of rescanning the full state dicts once per mapping entry. Entries are
+    applied in mapping order, so later entries win when several write the same target key.
+    """
+    simple = {k: v for k, v in mapping.items() if k.count("*") == v.count("*")}
+    source_matches = dict(zip(simple, _match_keys_multi(list(ctx.source_state.keys()), list(simple.keys()))))
+    target_matches = dict(zip(simple, _match_keys_multi(list(ctx.target_state.keys()), list(simple.values()))))
+
+    for source_key, target_key in mapping.items():
+        if source_key not in simple:
+            ctx = StateDictTransform(source_key, target_key)(ctx)
+            continue
+
+        source_match, target_match = source_matches[source_key], target_matches[source_key]
+        if source_match.size == 0 or (source_match.ndim == 0 and source_match.item() is None):
+            raise ValueError(f"No matches found for source key: {source_key}")
+        if target_match.size == 0 or (target_match.ndim == 0 and target_match.item() is None):
+            raise ValueError(f"No matches found for target key: {target_key}")
+
+        for target_index, target_name in np.ndenumerate(target_match):
+            ctx.target_state[target_name] = _default_transform(ctx, ctx.source_state[source_match[target_index]])
+
+    return ctx
 
 
 @overload
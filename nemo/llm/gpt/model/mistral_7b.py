@@ -1,6 +1,8 @@
-from dataclasses import dataclass, field
+import os
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable, List, Optional
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
 
 import torch
 import torch.nn.functional as F
@@ -32,7 +34,7 @@ class Mistral7BConfig(GPTConfig):
 
     init_method_std: float = 0.02
     layernorm_epsilon: float = 1e-5
-    window_size: List[int] = field(default_factory=lambda: [4096, 0])
+    window_size: Tuple[int, int] = (4096, 0)
 
 
 class Mistral7BModel(GPTModel):
@@ -44,14 +46,18 @@ class Mistral7BModel(GPTModel):
 
 @io.model_importer(Mistral7BModel, "hf", default_path="mistralai/Mistral-7B-v0.1")
 class HFMistral7BImporter(io.ModelConnector["MistralForCausalLM", Mistral7BModel]):
+    num_workers: int = 4
+
     def init(self) -> Mistral7BModel:
         return Mistral7BModel(self.config, tokenizer=self.tokenizer)
 
     def apply(self, output_path: Path) -> Path:
-        from transformers import MistralForCausalLM
-
-        source = MistralForCausalLM.from_pretrained(str(self))
         target = self.init()
+        source = io.lazy_load_state(
+            self._hf_weights_path(),
+            config=self._hf_config,
+            dtype=target.config.params_dtype,
+        )
         trainer = self.nemo_setup(target)
         self.convert_state(source, target)
         self.nemo_save(output_path, trainer)
@@ -69,19 +75,51 @@ class HFMistral7BImporter(io.ModelConnector["MistralForCausalLM", Mistral7BModel
             "lm_head.weight": "output_layer.weight",
         }
 
-        return io.apply_transforms(source, target, mapping=mapping, transforms=[_import_qkv, _import_linear_fc1])
+        return io.apply_transforms(
+            source,
+            target,
+            mapping=mapping,
+            transforms=[_import_qkv, _import_linear_fc1],
+            num_workers=min(self.num_workers, target.config.num_layers, os.cpu_count() or 1),
+        )
+
+    def _hf_path(self, allow_patterns: Optional[List[str]] = None) -> Path:
+        if self.is_dir():
+            return self
+
+        from huggingface_hub import snapshot_download
+
+        return Path(snapshot_download(str(self), allow_patterns=allow_patterns))
+
+    def _hf_weights_path(self) -> Path:
+        # Prefer safetensors and only fall back to legacy .bin shards, never download both. No listing
+        # call is made so that cached weights can be imported with HF_HUB_OFFLINE=1.
+        path = self._hf_path(allow_patterns=["model*.safetensors", "model.safetensors.index.json"])
+        if any(path.glob("model*.safetensors")):
+            return path
+
+        return self._hf_path(allow_patterns=["pytorch_model*.bin", "pytorch_model.bin.index.json"])
+
+    @cached_property
+    def _hf_snapshot(self) -> Path:
+        # Config and tokenizer files only, weights are fetched separately in `apply`
+        return self._hf_path(allow_patterns=["*.json", "tokenizer*"])
+
+    @cached_property
+    def _hf_config(self) -> "MistralConfig":
+        from transformers import MistralConfig
+
+        return MistralConfig.from_pretrained(str(self._hf_snapshot))
 
     @property
     def tokenizer(self) -> "AutoTokenizer":
         from nemo.collections.common.tokenizers.huggingface.auto_tokenizer import AutoTokenizer
 
-        return AutoTokenizer(str(self))
+        return AutoTokenizer(str(self._hf_snapshot))
 
     @property
     def config(self) -> Mistral7BConfig:
-        from transformers import MistralConfig
-
-        source = MistralConfig.from_pretrained(str(self))
+        source = self._hf_config
 
         def make_vocab_size_divisible_by(mistral_vocab_size):
             base = 128
@@ -101,7 +139,7 @@ class HFMistral7BImporter(io.ModelConnector["MistralForCausalLM", Mistral7BModel
             rotary_base=source.rope_theta,
             gated_linear_unit=True,
             make_vocab_size_divisible_by=make_vocab_size_divisible_by(source.vocab_size),
-            window_size=[source.sliding_window, 0],
+            window_size=(source.sliding_window, 0),
         )
 
         return output
@@ -115,10 +153,12 @@ class HFMistral7BExporter(io.ModelConnector[Mistral7BModel, "MistralForCausalLM"
         return AutoModelForCausalLM.from_config(self.config)
 
     def apply(self, output_path: Path) -> Path:
-        # TODO: Make it work with lazy init
-        # with torch.device("meta"):
-        #     target = self.init()
-        target = self.init()
+        from accelerate import init_empty_weights
+
+        # Parameters are allocated on the meta device and replaced by `convert_state`,
+        # buffers are kept real so the model can be moved and saved afterwards.
+        with init_empty_weights():
+            target = self.init()
         source, _ = self.nemo_load(str(self))
         target = self.convert_state(source, target)
 
@@ -148,7 +188,9 @@ class HFMistral7BExporter(io.ModelConnector[Mistral7BModel, "MistralForCausalLM"
 
     @property
     def config(self) -> "MistralConfig":
-        source: Mistral7BConfig = io.load_ckpt(str(self)).model.config
+        # Load the checkpoint once; going through `self.tokenizer` would load it a second time
+        model = io.load_ckpt(str(self)).model
+        source: Mistral7BConfig = model.config
 
         from transformers import MistralConfig
 
@@ -163,7 +205,7 @@ class HFMistral7BExporter(io.ModelConnector[Mistral7BModel, "MistralForCausalLM"
             rms_norm_eps=source.layernorm_epsilon,
             num_key_value_heads=source.num_query_groups,
             rope_theta=source.rotary_base,
-            vocab_size=self.tokenizer.vocab_size,
+            vocab_size=model.tokenizer.tokenizer.vocab_size,
         )
 
 
@@ -189,16 +231,12 @@ def _import_qkv(ctx: io.TransformCTX, q, k, v):
     new_q_tensor_shape = (head_num, head_size) + old_tensor_shape[1:]
     new_kv_tensor_shape = (num_query_groups, head_size) + old_tensor_shape[1:]
 
-    q = q.view(*new_q_tensor_shape)
-    k = k.view(*new_kv_tensor_shape)
-    v = v.view(*new_kv_tensor_shape)
+    q = q.view(num_query_groups, heads_per_group, *new_q_tensor_shape[1:])
+    k = k.view(num_query_groups, 1, *new_kv_tensor_shape[1:])
+    v = v.view(num_query_groups, 1, *new_kv_tensor_shape[1:])
 
-    qkv_weights_l = []
-    for i in range(num_query_groups):
-        qkv_weights_l.append(q[i * heads_per_group : (i + 1) * heads_per_group, :, :])
-        qkv_weights_l.append(k[i : i + 1, :, :])
-        qkv_weights_l.append(v[i : i + 1, :, :])
-    qkv_weights = torch.cat(qkv_weights_l)
+    # Interleave [q heads, k, v] per query group with a single cat instead of 3 * num_query_groups slices
+    qkv_weights = torch.cat((q, k, v), dim=1).flatten(0, 1)
     assert qkv_weights.ndim == 3, qkv_weights.shape
     assert qkv_weights.shape[0] == (heads_per_group + 2) * num_query_groups, qkv_weights.shape
     assert qkv_weights.shape[1] == head_size, qkv_weights.shape
@@ -206,7 +244,7 @@ def _import_qkv(ctx: io.TransformCTX, q, k, v):
 
     qkv_weights = qkv_weights.reshape([head_size * (head_num + 2 * num_query_groups), hidden_size])
 
-    return qkv_weights
+    return qkv_weights.to(megatron_config.params_dtype)
 
 
 @io.state_transform(
@@ -249,8 +287,8 @@ def _export_qkv(ctx: io.TransformCTX, linear_qkv):
     source_key=("model.layers.*.mlp.gate_proj.weight", "model.layers.*.mlp.up_proj.weight"),
     target_key="decoder.layers.*.mlp.linear_fc1.weight",
 )
-def _import_linear_fc1(down, gate):
-    return torch.cat((down, gate), axis=0).float()
+def _import_linear_fc1(ctx: io.TransformCTX, down, gate):
+    return torch.cat((down, gate), axis=0).to(ctx.target.config.params_dtype)
 
 
 @io.state_transform(
@@ -1,7 +1,20 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
 import pytest
+import torch
 from torch import nn
 
-from nemo.io.state import StateDictTransform, TransformCTX, state_transform
+from nemo.io.state import (
+    StateDictTransform,
+    TransformCTX,
+    _apply_mapping,
+    apply_transforms,
+    lazy_load_state,
+    state_transform,
+)
 
 
 class TestStateDictTransform:
@@ -112,6 +125,21 @@ class TestStateDictTransform:
         assert mock_ctx.target_state["decoder.layers.0.self_attention.linear_qkv.weight"] == 6
         assert mock_ctx.target_state["decoder.layers.1.self_attention.linear_qkv.weight"] == 6
 
+    def test_transform_with_executor(self, mock_ctx):
+        """
+        Test that per-key calls dispatched to an executor produce the same target state.
+        """
+        transform = StateDictTransform(
+            source_key="model.layers.*.self_attn.*_proj.weight",
+            target_key="decoder.layers.*.self_attention.linear_qkv.weight",
+            transform=lambda ctx, *args: sum(args),
+        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            mock_ctx.executor = executor
+            transform(mock_ctx)
+        assert mock_ctx.target_state["decoder.layers.0.self_attention.linear_qkv.weight"] == 6
+        assert mock_ctx.target_state["decoder.layers.1.self_attention.linear_qkv.weight"] == 6
+
     def test_transform_with_no_matching_source_keys(self, mock_ctx):
         """
         Test transformation when no source keys match the pattern.
@@ -208,6 +236,267 @@ class TestStateTransformDecorator:
         assert mock_ctx.target_state["decoder.layers.1.self_attention.linear_v.weight"] == 3
 
 
+class TestApplyMapping:
+    """
+    Tests for renaming keys through a plain key mapping.
+    """
+
+    def test_mapping_with_wildcards(self):
+        """
+        Test that every mapping entry is applied from a single classification pass.
+        """
+        source_state = {
+            "model.layers.0.mlp.down_proj.weight": torch.ones(1),
+            "model.layers.1.mlp.down_proj.weight": torch.zeros(1),
+            "model.norm.weight": torch.full((1,), 2.0),
+        }
+        target_state = {
+            "decoder.layers.0.mlp.linear_fc2.weight": None,
+            "decoder.layers.1.mlp.linear_fc2.weight": None,
+            "decoder.final_layernorm.weight": None,
+        }
+        ctx = TransformCTX(
+            source=nn.Module(), source_state=source_state, target=nn.Module(), target_state=target_state
+        )
+        _apply_mapping(
+            ctx,
+            {
+                "model.layers.*.mlp.down_proj.weight": "decoder.layers.*.mlp.linear_fc2.weight",
+                "model.norm.weight": "decoder.final_layernorm.weight",
+            },
+        )
+        assert torch.equal(target_state["decoder.layers.0.mlp.linear_fc2.weight"], torch.ones(1))
+        assert torch.equal(target_state["decoder.layers.1.mlp.linear_fc2.weight"], torch.zeros(1))
+        assert torch.equal(target_state["decoder.final_layernorm.weight"], torch.full((1,), 2.0))
+
+    def test_mapping_keeps_target_params_dtype(self):
+        """
+        Test that mapped values are cast to the params_dtype of the target config, not to fp32.
+        """
+        target = nn.Module()
+        target.config = SimpleNamespace(params_dtype=torch.bfloat16)
+        ctx = TransformCTX(
+            source=nn.Module(),
+            source_state={"model.norm.weight": torch.ones(1, dtype=torch.bfloat16)},
+            target=target,
+            target_state={"decoder.final_layernorm.weight": None},
+        )
+        _apply_mapping(ctx, {"model.norm.weight": "decoder.final_layernorm.weight"})
+        assert ctx.target_state["decoder.final_layernorm.weight"].dtype == torch.bfloat16
+
+    def test_mapping_with_overlapping_source_patterns(self):
+        """
+        Test that a key matched by several mapping patterns is assigned to each of them.
+        """
+        source_state = {"model.embed.weight": torch.ones(1), "model.norm.weight": torch.zeros(1)}
+        target_state = {"a.embed.w": None, "a.norm.w": None, "b.w": None}
+        ctx = TransformCTX(
+            source=nn.Module(), source_state=source_state, target=nn.Module(), target_state=target_state
+        )
+        _apply_mapping(ctx, {"model.*.weight": "a.*.w", "model.norm.weight": "b.w"})
+        assert torch.equal(target_state["a.embed.w"], torch.ones(1))
+        assert torch.equal(target_state["a.norm.w"], torch.zeros(1))
+        assert torch.equal(target_state["b.w"], torch.zeros(1))
+
+    def test_mapping_with_tied_target(self):
+        """
+        Test that several mapping entries may write the same target key, the last one winning.
+        """
+        source_state = {"model.embed.weight": torch.ones(1), "lm_head.weight": torch.zeros(1)}
+        ctx = TransformCTX(
+            source=nn.Module(), source_state=source_state, target=nn.Module(), target_state={"out.w": None}
+        )
+        _apply_mapping(ctx, {"model.embed.weight": "out.w", "lm_head.weight": "out.w"})
+        assert torch.equal(ctx.target_state["out.w"], torch.zeros(1))
+
+    def test_mapping_with_no_matching_source_keys(self):
+        """
+        Test that a mapping entry without any source match raises.
+        """
+        ctx = TransformCTX(
+            source=nn.Module(), source_state={}, target=nn.Module(), target_state={"decoder.final_layernorm.weight": 0}
+        )
+        with pytest.raises(ValueError):
+            _apply_mapping(ctx, {"model.norm.weight": "decoder.final_layernorm.weight"})
+
+
+class TestApplyTransforms:
+    """
+    Tests for apply_transforms end to end.
+    """
+
+    @pytest.fixture
+    def shutdowns(self):
+        """
+        Records each shutdown of the thread pool created by apply_transforms.
+        """
+        calls = []
+
+        class _RecordingExecutor(ThreadPoolExecutor):
+            def shutdown(self, *args, **kwargs):
+                calls.append(self)
+                super().shutdown(*args, **kwargs)
+
+        with patch("nemo.io.state.ThreadPoolExecutor", _RecordingExecutor):
+            yield calls
+
+    def test_apply_transforms_with_workers(self, shutdowns):
+        """
+        Test that transforms run through a thread pool give the same weights and release the pool.
+        """
+        source, target = nn.Linear(2, 2), nn.Linear(2, 2)
+        double = StateDictTransform("weight", "weight", lambda x: x * 2)
+
+        apply_transforms(source, target, mapping={"bias": "bias"}, transforms=[double], num_workers=2)
+
+        assert torch.equal(target.weight, source.weight * 2)
+        assert torch.equal(target.bias, source.bias)
+        assert len(shutdowns) == 1
+
+    def test_apply_transforms_splits_threads_between_workers(self, shutdowns):
+        """
+        Test that each worker gets its share of the intra-op threads and the caller's count is restored.
+        """
+        num_threads = torch.get_num_threads()
+        worker_threads = []
+
+        def record(x):
+            worker_threads.append(torch.get_num_threads())
+            return x
+
+        try:
+            torch.set_num_threads(4)
+            apply_transforms(
+                nn.Linear(2, 2),
+                nn.Linear(2, 2),
+                mapping={"bias": "bias"},
+                transforms=[StateDictTransform("weight", "weight", record)],
+                num_workers=2,
+            )
+            assert worker_threads == [2]
+            assert torch.get_num_threads() == 4
+        finally:
+            torch.set_num_threads(num_threads)
+
+    def test_apply_transforms_releases_workers_on_error(self, shutdowns):
+        """
+        Test that the thread pool is shut down when a transform fails.
+        """
+
+        def fail(x):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            apply_transforms(
+                nn.Linear(2, 2),
+                nn.Linear(2, 2),
+                mapping={"bias": "bias"},
+                transforms=[StateDictTransform("weight", "weight", fail)],
+                num_workers=2,
+            )
+        assert len(shutdowns) == 1
+
+
+class TestLazyLoadState:
+    """
+    Tests for reading source state lazily from safetensors shards.
+    """
+
+    @pytest.fixture
+    def shard_dir(self, tmp_path):
+        """
+        Writes two safetensors shards holding the weights of a two-layer model.
+        """
+        from safetensors.torch import save_file
+
+        save_file({"model.layers.0.mlp.weight": torch.ones(2, 2)}, str(tmp_path / "model-00001-of-00002.safetensors"))
+        save_file({"model.layers.1.mlp.weight": torch.zeros(2, 2)}, str(tmp_path / "model-00002-of-00002.safetensors"))
+        return tmp_path
+
+    def test_keys_span_all_shards(self, shard_dir):
+        """
+        Test that keys from every shard are exposed through the state dict.
+        """
+        state = lazy_load_state(shard_dir).state_dict()
+        assert sorted(state) == ["model.layers.0.mlp.weight", "model.layers.1.mlp.weight"]
+        assert torch.equal(state["model.layers.1.mlp.weight"], torch.zeros(2, 2))
+
+    def test_transform_on_lazy_state(self, shard_dir):
+        """
+        Test that a StateDictTransform consumes the lazy state like a regular state dict.
+        """
+        source = lazy_load_state(shard_dir)
+        ctx = TransformCTX(
+            source=source,
+            source_state=source.state_dict(),
+            target=nn.Module(),
+            target_state={"decoder.layers.0.mlp.weight": 0, "decoder.layers.1.mlp.weight": 0},
+        )
+        StateDictTransform("model.layers.*.mlp.weight", "decoder.layers.*.mlp.weight", lambda x: x + 1)(ctx)
+        assert torch.equal(ctx.target_state["decoder.layers.0.mlp.weight"], torch.full((2, 2), 2.0))
+        assert torch.equal(ctx.target_state["decoder.layers.1.mlp.weight"], torch.ones(2, 2))
+
+    def test_cast_on_read(self, shard_dir):
+        """
+        Test that tensors are cast to the requested dtype as they are read.
+        """
+        state = lazy_load_state(shard_dir, dtype=torch.bfloat16).state_dict()
+        assert state["model.layers.0.mlp.weight"].dtype == torch.bfloat16
+
+    def test_bin_shards_fallback(self, tmp_path):
+        """
+        Test that legacy .bin shards are read when no safetensors are present.
+        """
+        torch.save({"model.layers.0.mlp.weight": torch.ones(2, 2)}, str(tmp_path / "pytorch_model.bin"))
+        state = lazy_load_state(tmp_path).state_dict()
+        assert list(state) == ["model.layers.0.mlp.weight"]
+        assert torch.equal(state["model.layers.0.mlp.weight"], torch.ones(2, 2))
+
+    def test_index_limits_shards(self, shard_dir):
+        """
+        Test that only the files listed in the index are read, ignoring other weight files.
+        """
+        from safetensors.torch import save_file
+
+        save_file({"layers.0.weight": torch.ones(2, 2)}, str(shard_dir / "consolidated.safetensors"))
+        weight_map = {
+            "model.layers.0.mlp.weight": "model-00001-of-00002.safetensors",
+            "model.layers.1.mlp.weight": "model-00002-of-00002.safetensors",
+        }
+        (shard_dir / "model.safetensors.index.json").write_text(json.dumps({"weight_map": weight_map}))
+
+        state = lazy_load_state(shard_dir).state_dict()
+        assert sorted(state) == sorted(weight_map)
+
+    def test_bin_index(self, tmp_path):
+        """
+        Test that the .bin fallback follows pytorch_model.bin.index.json.
+        """
+        torch.save({"model.layers.0.mlp.weight": torch.ones(2, 2)}, str(tmp_path / "pytorch_model-00001-of-00001.bin"))
+        torch.save({"stale.weight": torch.ones(2, 2)}, str(tmp_path / "pytorch_model_old.bin"))
+        weight_map = {"model.layers.0.mlp.weight": "pytorch_model-00001-of-00001.bin"}
+        (tmp_path / "pytorch_model.bin.index.json").write_text(json.dumps({"weight_map": weight_map}))
+
+        assert list(lazy_load_state(tmp_path).state_dict()) == ["model.layers.0.mlp.weight"]
+
+    def test_duplicate_keys(self, shard_dir):
+        """
+        Test that a key stored in more than one shard raises instead of silently overwriting.
+        """
+        from safetensors.torch import save_file
+
+        save_file({"model.layers.0.mlp.weight": torch.zeros(2, 2)}, str(shard_dir / "model-extra.safetensors"))
+        with pytest.raises(ValueError):
+            lazy_load_state(shard_dir)
+
+    def test_missing_shards(self, tmp_path):
+        """
+        Test that pointing at a directory without shards fails loudly.
+        """
+        with pytest.raises(FileNotFoundError):
+            lazy_load_state(tmp_path)
+
+
 @state_transform(
     source_key="model.layers.*.self_attn.q_proj.weight", target_key="decoder.layers.1.self_attention.linear_q.weight"
 )
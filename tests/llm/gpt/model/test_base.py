@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+import torch
+
+from nemo.llm.gpt.model.base import get_batch_on_this_context_parallel_rank, get_packed_seq_params
+
+
+def test_get_packed_seq_params_with_argmin() -> None:
+    batch = {
+        "cu_seqlens": torch.tensor([[0, 3, 5, -1, -1]]),
+        "cu_seqlens_argmin": torch.tensor([3]),
+        "max_seqlen": torch.tensor([3]),
+    }
+
+    params = get_packed_seq_params(batch)
+
+    assert torch.equal(params.cu_seqlens_q, torch.tensor([0, 3, 5]))
+    assert torch.equal(params.cu_seqlens_kv, torch.tensor([0, 3, 5]))
+
+
+def test_get_packed_seq_params_without_argmin() -> None:
+    batch = {"cu_seqlens": torch.tensor([[0, 3, 5, -1, -1]])}
+
+    params = get_packed_seq_params(batch)
+
+    assert torch.equal(params.cu_seqlens_q, torch.tensor([0, 3, 5]))
+    assert params.max_seqlen_q is None
+
+
+@patch("megatron.core.parallel_state.get_context_parallel_rank", return_value=0)
+@patch("megatron.core.parallel_state.get_context_parallel_world_size", return_value=2)
+def test_get_batch_on_this_context_parallel_rank(mock_world_size, mock_rank) -> None:
+    _tensor = torch.tensor
+
+    # Run the rank-index construction on CPU
+    with patch("torch.tensor", lambda *args, pin_memory=False, **kwargs: _tensor(*args, **kwargs)), patch(
+        "torch.Tensor.cuda", lambda self, *args, **kwargs: self
+    ):
+        batch = get_batch_on_this_context_parallel_rank(
+            {"tokens": torch.arange(8).unsqueeze(0), "loss_mask": torch.ones(1, 8)}
+        )
+
+    # cp_size=2 splits the sequence into 4 chunks; rank 0 keeps the first and the last one
+    assert torch.equal(batch["tokens"], torch.tensor([[0, 1, 6, 7]]))
+    assert batch["num_valid_tokens_in_ub"] == 8
@@ -0,0 +1,110 @@
+from fnmatch import fnmatch
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+import torch
+from torch import nn
+
+from nemo import io
+from nemo.llm.gpt.model.mistral_7b import HFMistral7BImporter, _import_linear_fc1, _import_qkv
+
+
+def _import_ctx(source_state, target_state, **config) -> io.TransformCTX:
+    target = nn.Module()
+    target.config = SimpleNamespace(params_dtype=torch.bfloat16, **config)
+
+    return io.TransformCTX(source=nn.Module(), source_state=source_state, target=target, target_state=target_state)
+
+
+def test_import_linear_fc1_keeps_params_dtype() -> None:
+    ctx = _import_ctx(
+        {
+            "model.layers.0.mlp.gate_proj.weight": torch.ones(2, 3, dtype=torch.bfloat16),
+            "model.layers.0.mlp.up_proj.weight": torch.zeros(2, 3, dtype=torch.bfloat16),
+        },
+        {"decoder.layers.0.mlp.linear_fc1.weight": None},
+    )
+
+    _import_linear_fc1(ctx)
+
+    linear_fc1 = ctx.target_state["decoder.layers.0.mlp.linear_fc1.weight"]
+    assert linear_fc1.dtype == torch.bfloat16
+    assert torch.equal(linear_fc1, torch.cat((torch.ones(2, 3), torch.zeros(2, 3))).bfloat16())
+
+
+def test_import_qkv_keeps_params_dtype() -> None:
+    hidden_size, head_size = 4, 2
+    ctx = _import_ctx(
+        {
+            "model.layers.0.self_attn.q_proj.weight": torch.randn(hidden_size, hidden_size, dtype=torch.bfloat16),
+            "model.layers.0.self_attn.k_proj.weight": torch.randn(head_size, hidden_size, dtype=torch.bfloat16),
+            "model.layers.0.self_attn.v_proj.weight": torch.randn(head_size, hidden_size, dtype=torch.bfloat16),
+        },
+        {"decoder.layers.0.self_attention.linear_qkv.weight": None},
+        num_attention_heads=2,
+        num_query_groups=1,
+        hidden_size=hidden_size,
+    )
+
+    _import_qkv(ctx)
+
+    qkv = ctx.target_state["decoder.layers.0.self_attention.linear_qkv.weight"]
+    assert qkv.dtype == torch.bfloat16
+    assert qkv.shape == (2 * hidden_size, hidden_size)
+
+
+def _fake_snapshot_download(cached_files, snapshot_dir):
+    # Mirrors a cached snapshot: only the files matching `allow_patterns` come back
+    def snapshot_download(repo_id, allow_patterns=None):
+        for name in cached_files:
+            if allow_patterns is None or any(fnmatch(name, pattern) for pattern in allow_patterns):
+                (snapshot_dir / name).touch()
+        return str(snapshot_dir)
+
+    return snapshot_download
+
+
+@pytest.mark.parametrize(
+    "cached_files, allow_patterns",
+    [
+        (
+            ["config.json", "model-00001-of-00002.safetensors", "pytorch_model-00001-of-00002.bin"],
+            [["model*.safetensors", "model.safetensors.index.json"]],
+        ),
+        (
+            ["config.json", "pytorch_model-00001-of-00002.bin"],
+            [["model*.safetensors", "model.safetensors.index.json"], ["pytorch_model*.bin", "pytorch_model.bin.index.json"]],
+        ),
+    ],
+)
+def test_hf_weights_path_offline(cached_files, allow_patterns, tmp_path) -> None:
+    importer = HFMistral7BImporter("mistralai/Mistral-7B-v0.1")
+
+    # Any listing call against the Hub raises OfflineModeIsEnabled with offline mode on
+    with patch("huggingface_hub.constants.HF_HUB_OFFLINE", True), patch(
+        "huggingface_hub.snapshot_download", side_effect=_fake_snapshot_download(cached_files, tmp_path)
+    ) as mock_snapshot_download:
+        assert importer._hf_weights_path() == tmp_path
+
+    assert [call.kwargs["allow_patterns"] for call in mock_snapshot_download.call_args_list] == allow_patterns
+
+
+def test_hf_weights_path_local_dir(tmp_path) -> None:
+    importer = HFMistral7BImporter(str(tmp_path))
+
+    with patch("huggingface_hub.snapshot_download") as mock_snapshot_download:
+        assert importer._hf_weights_path() == tmp_path
+
+    mock_snapshot_download.assert_not_called()
+
+
+@pytest.mark.parametrize("num_layers, cpu_count, num_workers", [(2, 64, 2), (32, 64, 4), (32, 1, 1), (32, None, 1)])
+def test_convert_state_caps_workers(num_layers, cpu_count, num_workers) -> None:
+    importer = HFMistral7BImporter("mistralai/Mistral-7B-v0.1")
+    target = SimpleNamespace(config=SimpleNamespace(num_layers=num_layers))
+
+    with patch("os.cpu_count", return_value=cpu_count), patch("nemo.io.apply_transforms") as mock_apply_transforms:
+        importer.convert_state(nn.Module(), target)
+
+    assert mock_apply_transforms.call_args.kwargs["num_workers"] == num_workers